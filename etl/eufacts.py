@@ -21,19 +21,33 @@ Daarnaast:
 - data/latest/manifest.json bevat metadata over alle datasets.
 """
 
+import os
 import sys
 import json
+import shutil
 import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Tuple
 from pathlib import Path
 
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # orjson is optioneel; zonder orjson valt de ETL terug op stdlib json
+    orjson = None
 
 # ---------- Config (algemeen) ----------
 BASE_URL = "https://ec.europa.eu/eurostat/api/dissemination/statistics/1.0/data"
 TIMEOUT_S = 60
+HTTP_RETRIES = 3
+USER_AGENT = "eufacts-etl/1.0"
+MAX_WORKERS = 4  # datasets parallel ophalen/verwerken (I/O-bound)
 
 # ---------- Te verwerken datasets ----------
 DATASETS = [
@@ -83,10 +97,6 @@ LATEST_DIR = OUT_DIR / "latest"
 SNAPSHOTS_DIR = OUT_DIR / "snapshots"
 TIMESERIES_DIR = OUT_DIR / "timeseries"
 
-DATE_TODAY = datetime.now(timezone.utc).date().isoformat()
-SNAP_DIR = SNAPSHOTS_DIR / DATE_TODAY
-TS_DIR = TIMESERIES_DIR / DATE_TODAY
-
 MANIFEST_OUT = LATEST_DIR / "manifest.json"
 
 # ---------- Logging ----------
@@ -96,27 +106,132 @@ logging.basicConfig(
 )
 log = logging.getLogger("etl.eurostat_multi")
 
+# ---------- HTTP ----------
+# Eén sessie voor alle datasets: keep-alive (geen nieuwe TLS-handshake per dataset),
+# compressie en retries op tijdelijke serverfouten.
+SESSION = requests.Session()
+SESSION.headers.update({
+    "Accept": "application/json",
+    # gzip/deflate, plus br (brotli) alleen als urllib3 het kan decoderen
+    "Accept-Encoding": requests.utils.DEFAULT_ACCEPT_ENCODING,
+    "User-Agent": f"{USER_AGENT} {requests.utils.default_user_agent()}",
+})
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=MAX_WORKERS,
+    pool_maxsize=MAX_WORKERS,
+    max_retries=Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+    ),
+))
+
 # ---------- Helpers ----------
 def sha256_file(path: Path) -> str:
-    h = hashlib.sha256()
     with path.open("rb") as f:
+        if sys.version_info >= (3, 11):
+            # Lees+hash-lus volledig in C
+            return "sha256:" + hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
         for chunk in iter(lambda: f.read(8192), b""):
             h.update(chunk)
     return "sha256:" + h.hexdigest()
 
-def fetch_json(url: str) -> Dict[str, Any]:
+def sha256_bytes(data: bytes) -> str:
+    """Hash van al geserialiseerde bytes (zelfde formaat als sha256_file, zonder disk-read)."""
+    return "sha256:" + hashlib.sha256(data).hexdigest()
+
+def _load_bytes(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def fetch_json(url: str, prior: Dict[str, Any] | None = None) -> Tuple[Dict[str, Any] | None, Dict[str, Any]]:
+    """
+    Haal de Eurostat JSON op; conditioneel (ETag/Last-Modified) t.o.v. de vorige run.
+
+    Return:
+        cube (dict, of None bij 304 Not Modified),
+        http_meta (dict met etag, last_modified en source_hash)
+    """
+    headers = {}
+    if prior:
+        if prior.get("etag"):
+            headers["If-None-Match"] = prior["etag"]
+        if prior.get("last_modified"):
+            headers["If-Modified-Since"] = prior["last_modified"]
     log.info("Fetching Eurostat JSON: %s", url)
-    r = requests.get(url, timeout=TIMEOUT_S)
+    r = SESSION.get(url, timeout=TIMEOUT_S, headers=headers)
+    if r.status_code == 304 and prior:
+        return None, {
+            "etag": prior.get("etag"),
+            "last_modified": prior.get("last_modified"),
+            "source_hash": prior.get("source_hash"),
+        }
     r.raise_for_status()
-    return r.json()
+    http_meta = {
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "source_hash": sha256_bytes(r.content),
+    }
+    return _load_bytes(r.content), http_meta
+
+def _config_fingerprint(dataset_cfg: Dict[str, Any]) -> str:
+    """
+    Hash van de dataset-config plus dit script.
+
+    Een 304 of gelijke source_hash zegt alleen dat de bron gelijk is; als config
+    (beschrijving, notes) of de ETL-code zelf is gewijzigd, moeten de outputs toch opnieuw.
+    """
+    h = hashlib.sha256(Path(__file__).read_bytes())
+    h.update(json.dumps(dataset_cfg, sort_keys=True).encode("utf-8"))
+    return "sha256:" + h.hexdigest()
+
+def load_manifest() -> Dict[str, Any]:
+    """Lees het manifest van de vorige run (leeg als het ontbreekt of onleesbaar is)."""
+    try:
+        return _load_bytes(MANIFEST_OUT.read_bytes())
+    except (OSError, ValueError):
+        return {"datasets": {}}
 
-def _linear_index_to_coords(idx: int, dims_sizes: List[int]) -> List[int]:
-    """Zet lineaire index om naar coördinaten per dimensie (row-major)."""
-    coords = []
-    for size in reversed(dims_sizes):
-        coords.append(idx % size)
-        idx //= size
-    return list(reversed(coords))
+def _outputs_intact(entry: Dict[str, Any]) -> bool:
+    """Controleer of de latest-bestanden van een manifest-entry nog op disk staan met dezelfde hash."""
+    try:
+        pairs = [
+            (entry["latest_files"]["cross_section"], entry["hashes"]["latest_cross"]),
+            (entry["latest_files"]["timeseries_hyphen"], entry["hashes"]["latest_timeseries"]),
+        ]
+        return all(h and sha256_file(OUT_DIR / rel) == h for rel, h in pairs)
+    except (OSError, KeyError, TypeError):
+        return False
+
+def _row_major_strides(sizes: np.ndarray) -> np.ndarray:
+    """Stride per dimensie: positie d = (idx // strides[d]) % sizes[d]."""
+    strides = np.ones(sizes.size, dtype=np.int64)
+    for d in range(sizes.size - 2, -1, -1):
+        strides[d] = strides[d + 1] * sizes[d + 1]
+    return strides
+
+def _decode_filter(keys, sizes, strides, unit_axis, unit_pos, geo_axis, time_axis):
+    """
+    Decodeer lineaire indices (row-major) en filter op unit-positie.
+
+    Alleen de unit-, geo- en time-as worden berekend (via strides), niet alle dimensies.
+    unit_axis == -1 betekent: geen unit-dimensie; unit_pos == -1: niet filteren.
+    Return: (rows, geo_pos, time_pos, unit_pos) van de overgebleven cellen.
+    """
+    rows = np.arange(keys.size)
+    if unit_axis >= 0:
+        units = (keys // strides[unit_axis]) % sizes[unit_axis]
+        if unit_pos >= 0:
+            rows = np.flatnonzero(units == unit_pos)
+            keys = keys[rows]
+            units = units[rows]
+    else:
+        units = np.zeros(keys.size, dtype=np.int64)
+    geo = (keys // strides[geo_axis]) % sizes[geo_axis]
+    time = (keys // strides[time_axis]) % sizes[time_axis]
+    return rows, geo, time, units
 
 def _build_dim_meta(cube: Dict[str, Any]) -> Tuple[List[str], List[int], Dict[str, Any]]:
     dim_ids: List[str] = cube["id"]        # bijv. ["unit", "geo", "time"]
@@ -124,37 +239,41 @@ def _build_dim_meta(cube: Dict[str, Any]) -> Tuple[List[str], List[int], Dict[st
     dimension = cube["dimension"]
 
     dim_meta: Dict[str, Any] = {}
-    for d in dim_ids:
+    for d, dim_size in zip(dim_ids, size):
         cat = dimension[d]["category"]
         index_map: Dict[str, int] = cat.get("index", {})
         if not index_map:
             members = list(cat.get("label", {}).keys())
             index_map = {m: i for i, m in enumerate(members)}
         labels: Dict[str, str] = cat.get("label", {})
-        inv_index = {pos: code for code, pos in index_map.items()}
+        # Posities zijn dicht (0..size-1): lijsten i.p.v. dicts voor pos -> code/label
+        inv_index: List[str | None] = [None] * dim_size
+        for code, pos in index_map.items():
+            inv_index[pos] = code
+        inv_labels = [labels.get(code, code) for code in inv_index]
         size_guess = dimension[d]["category"].get("length", len(index_map))
         dim_meta[d] = {
-            "index": index_map,     # code -> pos
-            "inv_index": inv_index, # pos -> code
-            "labels": labels,       # code -> label
+            "index": index_map,       # code -> pos
+            "inv_index": inv_index,   # pos -> code
+            "labels": labels,         # code -> label
+            "inv_labels": inv_labels, # pos -> label
             "size": size_guess,
         }
     return dim_ids, size, dim_meta
 
-def _choose_pct_unit(records: List[Dict[str, Any]]) -> str | None:
-    """Kies unit-code die % of GDP representeert."""
-    units_present = sorted({r["unit_code"] for r in records if r.get("unit_code")})
+def _choose_pct_unit(dim_meta: Dict[str, Any]) -> str | None:
+    """Kies unit-code die % of GDP representeert (op basis van de unit-dimensie)."""
+    unit_meta = dim_meta.get("unit")
+    if not unit_meta:
+        return None
+    units_present = sorted(unit_meta["index"])
     # 1) voorkeurscodes
     for candidate in ("PC_GDP", "PCGDP", "PCT_GDP", "PCTGDP"):
         if candidate in units_present:
             return candidate
     # 2) label bevat '%'
-    unit_labels = {}
-    for r in records:
-        uc = r.get("unit_code")
-        if uc and uc not in unit_labels:
-            unit_labels[uc] = r.get("unit_label")
-    for code, label in unit_labels.items():
+    for code in unit_meta["index"]:
+        label = unit_meta["labels"].get(code, code)
         if label and "%" in label:
             return code
     # 3) fallback: enige unit
@@ -182,71 +301,91 @@ def parse_latest_and_timeseries(cube: Dict[str, Any]) -> Tuple[List[Dict[str, An
 
     if "time" not in dim_meta:
         raise ValueError("Geen 'time' dimensie gevonden in Eurostat response.")
+    if "geo" not in dim_meta:
+        raise ValueError("Geen 'geo' dimensie gevonden in Eurostat response.")
+    geo_axis = dim_ids.index("geo")
+    time_axis = dim_ids.index("time")
+    unit_axis = dim_ids.index("unit") if "unit" in dim_meta else None
     time_size = dim_meta["time"]["size"]
     latest_time_pos = time_size - 1
     latest_time_code = dim_meta["time"]["inv_index"][latest_time_pos]
-    latest_time_label = dim_meta["time"]["labels"].get(latest_time_code, latest_time_code)
-
-    # Verzamel alle records (alle periodes)
-    all_records: List[Dict[str, Any]] = []
-    for k, v in value_map.items():
-        lin_idx = int(k)
-        coords = _linear_index_to_coords(lin_idx, size)
-        coord_map = {}
-        for dim_name, pos in zip(dim_ids, coords):
-            inv = dim_meta[dim_name]["inv_index"]
-            code = inv[pos]
-            label = dim_meta[dim_name]["labels"].get(code, code)
-            coord_map[dim_name] = {"code": code, "label": label, "pos": pos}
-        all_records.append({
-            "value": v,
-            "unit_code": coord_map.get("unit", {}).get("code"),
-            "unit_label": coord_map.get("unit", {}).get("label"),
-            "geo_code": coord_map.get("geo", {}).get("code"),
-            "geo_label": coord_map.get("geo", {}).get("label"),
-            "time_code": coord_map.get("time", {}).get("code"),
-            "time_label": coord_map.get("time", {}).get("label"),
-            "time_pos": coord_map.get("time", {}).get("pos"),
-        })
-
-    # Unit-keuze (percentage-of-GDP)
-    chosen_unit = _choose_pct_unit(all_records)
-    if chosen_unit:
-        all_records = [r for r in all_records if r.get("unit_code") == chosen_unit]
-
-    # ---- Latest (alleen laatste periode) ----
-    latest_records = [r for r in all_records if r.get("time_pos") == latest_time_pos]
-    latest_records.sort(key=lambda x: (x["value"] is None, x["value"]), reverse=True)
-
+    latest_time_label = dim_meta["time"]["inv_labels"][latest_time_pos]
+
+    # Unit-keuze (percentage-of-GDP) direct uit de dimensie-metadata
+    chosen_unit = _choose_pct_unit(dim_meta)
+
+    # Decodeer alle lineaire indices in één keer en filter op de gekozen unit
+    keys = np.fromiter(value_map.keys(), dtype=np.int64, count=len(value_map))
+    values = list(value_map.values())  # originele waarden behouden (int/float/None)
+    sizes = np.asarray(size, dtype=np.int64)
+    if keys.size and (keys.min() < 0 or keys.max() >= sizes.prod()):
+        raise ValueError("Eurostat response bevat value-index buiten de kubus.")
+    unit_pos_wanted = dim_meta["unit"]["index"][chosen_unit] if chosen_unit else -1
+    rows, geo_pos, time_pos_arr, unit_pos_arr = _decode_filter(
+        keys,
+        sizes,
+        _row_major_strides(sizes),
+        -1 if unit_axis is None else unit_axis,
+        unit_pos_wanted,
+        geo_axis,
+        time_axis,
+    )
+
+    if unit_axis is not None:
+        inv_unit = dim_meta["unit"]["inv_index"]
+        units_present = sorted({inv_unit[p] for p in np.unique(unit_pos_arr).tolist() if inv_unit[p]})
+    else:
+        units_present = []
+
+    # Stabiel sorteren op tijdspositie: series komen zo oplopend binnen,
+    # en de volgorde binnen één periode blijft die van de API.
+    # Eén permutatie van de posities; waarden worden maar één keer opgehaald.
+    order = np.argsort(time_pos_arr, kind="stable")
+    geo_pos = geo_pos[order]
+    time_pos_arr = time_pos_arr[order]
+    values = [values[i] for i in rows[order].tolist()]
+
+    # ---- Latest + timeseries in één doorgang ----
+    # Geo-posities zijn dicht: series per positie in een lijst i.p.v. dict-lookups per cel
+    inv_geo = dim_meta["geo"]["inv_index"]
+    inv_geo_labels = dim_meta["geo"]["inv_labels"]
+    inv_time_labels = dim_meta["time"]["inv_labels"]
+    series_at: List[List[Dict[str, Any]] | None] = [None] * len(inv_geo)
     latest_output: List[Dict[str, Any]] = []
-    for r in latest_records:
-        latest_output.append({
-            "country_code": r["geo_code"],
-            "country": r["geo_label"],
-            "time": r["time_label"],
-            "value_pct_gdp": r["value"],
+    latest_append = latest_output.append
+    for v, gp, tp in zip(values, geo_pos.tolist(), time_pos_arr.tolist()):
+        time_label = inv_time_labels[tp]
+        if tp == latest_time_pos:
+            latest_append({
+                "country_code": inv_geo[gp],
+                "country": inv_geo_labels[gp],
+                "time": time_label,
+                "value_pct_gdp": v,
+            })
+        series = series_at[gp]
+        if series is None:
+            if not inv_geo[gp]:
+                continue
+            series = series_at[gp] = []
+        series.append({
+            "time": time_label,
+            "value_pct_gdp": v,
         })
 
-    # ---- Timeseries (N periodes per land) ----
-    series_by_geo: Dict[str, Dict[str, Any]] = {}
-    all_records_sorted = sorted(all_records, key=lambda x: (x["geo_code"], x["time_pos"]))
-    for r in all_records_sorted:
-        geo = r["geo_code"]
-        if not geo:
-            continue
-        if geo not in series_by_geo:
-            series_by_geo[geo] = {
-                "country_code": geo,
-                "country": r["geo_label"],
-                "unit": "% of GDP",
-                "series": []
-            }
-        series_by_geo[geo]["series"].append({
-            "time": r["time_label"],
-            "value_pct_gdp": r["value"],
-        })
+    latest_output.sort(key=lambda x: (x["value_pct_gdp"] is None, x["value_pct_gdp"]), reverse=True)
+
+    present = [gp for gp, series in enumerate(series_at) if series is not None]
+    present.sort(key=inv_geo.__getitem__)
+    series_by_geo: Dict[str, Dict[str, Any]] = {
+        inv_geo[gp]: {
+            "country_code": inv_geo[gp],
+            "country": inv_geo_labels[gp],
+            "unit": "% of GDP",
+            "series": series_at[gp],
+        }
+        for gp in present
+    }
 
-    units_present = sorted({r.get("unit_code") for r in all_records if r.get("unit_code")})
     meta = {
         "dim_ids": dim_ids,
         "units_present": units_present,
@@ -257,38 +396,72 @@ def parse_latest_and_timeseries(cube: Dict[str, Any]) -> Tuple[List[Dict[str, An
 
     return latest_output, series_by_geo, meta
 
-def build_latest_object(latest_records: List[Dict[str, Any]], source_url: str, dataset_cfg: Dict[str, Any], meta: Dict[str, Any]) -> Dict[str, Any]:
+def build_latest_object(latest_records: List[Dict[str, Any]], source_url: str, dataset_cfg: Dict[str, Any], meta: Dict[str, Any], updated_at: str) -> Dict[str, Any]:
     latest_time = meta.get("latest_time_label")
     return {
         "dataset": dataset_cfg["id"].upper(),
         "description": f"{dataset_cfg['description']} (latest period)",
         "source_url": source_url,
-        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": updated_at,
         "latest_period": latest_time,
         "unit": "% of GDP",
         "records": latest_records,
         "notes": dataset_cfg.get("notes_latest", []),
     }
 
-def build_timeseries_object(series_by_geo: Dict[str, Any], source_url: str, dataset_cfg: Dict[str, Any], meta: Dict[str, Any]) -> Dict[str, Any]:
+def build_timeseries_object(series_by_geo: Dict[str, Any], source_url: str, dataset_cfg: Dict[str, Any], meta: Dict[str, Any], updated_at: str) -> Dict[str, Any]:
     return {
         "dataset": dataset_cfg["id"].upper(),
         "description": f"{dataset_cfg['description']} (last {dataset_cfg['last_time_periods']} periods)",
         "source_url": source_url,
-        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": updated_at,
         "unit": "% of GDP",
         "latest_period": meta.get("latest_time_label"),
         "records": list(series_by_geo.values()),
         "notes": dataset_cfg.get("notes_timeseries", []),
     }
 
-def write_json(path: Path, obj: Dict[str, Any]):
+def _dump_bytes(obj: Dict[str, Any]) -> bytes:
+    # orjson schrijft UTF-8 bytes met 2-spatie indent (identiek aan json.dumps(indent=2, ensure_ascii=False))
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+def write_bytes(path: Path, data: bytes):
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(obj, indent=2, ensure_ascii=False), encoding="utf-8")
-    log.info("Wrote %s (%d bytes)", path, path.stat().st_size)
+    path.write_bytes(data)
+    log.info("Wrote %s (%d bytes)", path, len(data))
+
+def link_or_copy(src: Path, dst: Path):
+    """
+    Maak dst een hardlink naar src (kopie als hardlinks niet kunnen).
+
+    Via een tijdelijk pad + os.replace: een bestaande dst wordt vervangen i.p.v.
+    overschreven, zodat een eerdere snapshot die dezelfde inode deelt intact blijft.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if dst.exists() and os.path.samefile(src, dst):
+        return  # al gelinkt (bv. tweede run op dezelfde dag)
+    tmp = dst.with_name(dst.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        try:
+            os.link(src, tmp)
+            action = "Linked"
+        except OSError:
+            shutil.copyfile(src, tmp)
+            action = "Copied"
+        os.replace(tmp, dst)
+    finally:
+        # Nooit een half .tmp-bestand in data/ laten staan (de workflow commit data/)
+        tmp.unlink(missing_ok=True)
+    log.info("%s %s -> %s", action, dst, src)
+
+def write_json(path: Path, obj: Dict[str, Any]):
+    write_bytes(path, _dump_bytes(obj))
 
 # ---------- Hoofdlogica ----------
-def process_dataset(dataset_cfg: Dict[str, Any]) -> Dict[str, Any]:
+def process_dataset(dataset_cfg: Dict[str, Any], run_ts: str, run_date: str, prior_entry: Dict[str, Any] | None = None) -> Dict[str, Any]:
     dataset_id = dataset_cfg["id"]
     last_n = dataset_cfg["last_time_periods"]
 
@@ -298,9 +471,26 @@ def process_dataset(dataset_cfg: Dict[str, Any]) -> Dict[str, Any]:
         eurostat_url = f"{BASE_URL}/{dataset_id}?lastTimePeriod={last_n}"
     log.info("=== Processing dataset %s (lastTimePeriod=%s) ===", dataset_id, last_n)
 
-    # 1) Fetch
+    # Vorige run alleen gebruiken als die dezelfde bron-URL had
+    prior = prior_entry if prior_entry and prior_entry.get("source_url") == eurostat_url else None
+    # Bron-skip (304 / source_hash) alleen als ook config en ETL-code gelijk zijn gebleven
+    config_hash = _config_fingerprint(dataset_cfg)
+    same_config = prior is not None and prior.get("config_hash") == config_hash
+
+    # 1) Fetch (conditioneel)
     try:
-        cube = fetch_json(eurostat_url)
+        cube, http_meta = fetch_json(eurostat_url, prior if same_config else None)
+        unchanged = same_config and (cube is None or http_meta["source_hash"] == prior.get("source_hash"))
+        if unchanged and _outputs_intact(prior):
+            log.info(
+                "[%s] Bron ongewijzigd sinds vorige run (%s); outputs worden niet opnieuw geschreven.",
+                dataset_id,
+                "304 Not Modified" if cube is None else "zelfde source_hash",
+            )
+            return dataset_id, {**prior, **http_meta}
+        if cube is None:
+            # 304, maar de vorige outputs ontbreken of zijn gewijzigd: onvoorwaardelijk opnieuw ophalen
+            cube, http_meta = fetch_json(eurostat_url)
     except Exception:
         log.exception("Fout bij ophalen Eurostat JSON voor %s", dataset_id)
         raise
@@ -323,36 +513,45 @@ def process_dataset(dataset_cfg: Dict[str, Any]) -> Dict[str, Any]:
         raise RuntimeError(f"[{dataset_id}] Geen records gevonden na filtering; ETL wordt afgebroken.")
 
     # 3) Build output objects
-    latest_obj = build_latest_object(latest_records, eurostat_url, dataset_cfg, meta)
-    ts_obj = build_timeseries_object(series_by_geo, eurostat_url, dataset_cfg, meta)
-
-    # 4) Paden
-    snap_path = SNAP_DIR / f"{dataset_id}.json"
-    ts_path = TS_DIR / f"{dataset_id}.json"
+    latest_obj = build_latest_object(latest_records, eurostat_url, dataset_cfg, meta, run_ts)
+    ts_obj = build_timeseries_object(series_by_geo, eurostat_url, dataset_cfg, meta, run_ts)
+
+    # 4) Serialiseer één keer; dezelfde bytes gaan naar snapshot én latest alias.
+    # Bron gewijzigd (bv. alleen metadata of andere units), maar outputs inhoudelijk gelijk:
+    # met de updated_at van de vorige run zijn de bytes direct te vergelijken met de
+    # hashes in het manifest. Alleen bij gewijzigde inhoud opnieuw met run_ts serialiseren.
+    if prior is not None and prior.get("updated_at") and _outputs_intact(prior):
+        latest_obj["updated_at"] = ts_obj["updated_at"] = prior["updated_at"]
+        if sha256_bytes(_dump_bytes(latest_obj)) == prior["hashes"]["latest_cross"] \
+                and sha256_bytes(_dump_bytes(ts_obj)) == prior["hashes"]["latest_timeseries"]:
+            log.info("[%s] Outputs inhoudelijk ongewijzigd; niet opnieuw geschreven.", dataset_id)
+            return dataset_id, {**prior, **http_meta, "config_hash": config_hash}
+        latest_obj["updated_at"] = ts_obj["updated_at"] = run_ts
+    latest_bytes = _dump_bytes(latest_obj)
+    ts_bytes = _dump_bytes(ts_obj)
+
+    # 5) Paden
+    snap_path = SNAPSHOTS_DIR / run_date / f"{dataset_id}.json"
+    ts_path = TIMESERIES_DIR / run_date / f"{dataset_id}.json"
 
     latest_cross = LATEST_DIR / f"{dataset_id}.json"
     latest_ts_hyphen = LATEST_DIR / f"{dataset_id}-timeseries.json"
 
-    # 5) Write snapshots
-    write_json(snap_path, latest_obj)
-    write_json(ts_path, ts_obj)
+    # 6) Write snapshots
+    write_bytes(snap_path, latest_bytes)
+    write_bytes(ts_path, ts_bytes)
 
-    # 6) Write latest aliases
+    # 7) Latest aliases: hardlink naar de zojuist geschreven snapshots (inhoud is identiek)
     LATEST_DIR.mkdir(parents=True, exist_ok=True)
-    write_json(latest_cross, latest_obj)
-    write_json(latest_ts_hyphen, ts_obj)
+    link_or_copy(snap_path, latest_cross)
+    link_or_copy(ts_path, latest_ts_hyphen)
 
-    # 7) Hashes (nice-to-have)
-    try:
-        hash_snap = sha256_file(snap_path)
-        hash_ts = sha256_file(ts_path)
-        hash_latest = sha256_file(latest_cross)
-        hash_latest_ts = sha256_file(latest_ts_hyphen)
-    except Exception:
-        hash_snap = hash_ts = hash_latest = hash_latest_ts = None
+    # 8) Hashes over de geschreven bytes (geen herlezen van disk)
+    hash_snap = hash_latest = sha256_bytes(latest_bytes)
+    hash_ts = hash_latest_ts = sha256_bytes(ts_bytes)
 
     manifest_entry = {
-        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": run_ts,
         "latest_period": latest_obj.get("latest_period"),
         "unit": latest_obj.get("unit") or ts_obj.get("unit"),
         "latest_snapshot": str(snap_path.relative_to(OUT_DIR)),
@@ -368,6 +567,10 @@ def process_dataset(dataset_cfg: Dict[str, Any]) -> Dict[str, Any]:
             "latest_timeseries": hash_latest_ts,
         },
         "source_url": eurostat_url,
+        "etag": http_meta["etag"],
+        "last_modified": http_meta["last_modified"],
+        "source_hash": http_meta["source_hash"],
+        "config_hash": config_hash,
         "record_count_latest": len(latest_obj["records"]),
         "record_count_timeseries": sum(len(x["series"]) for x in ts_obj["records"]),
     }
@@ -375,16 +578,25 @@ def process_dataset(dataset_cfg: Dict[str, Any]) -> Dict[str, Any]:
     return dataset_id, manifest_entry
 
 def main():
+    # Eén tijdstempel per run: snapshot, latest en manifest krijgen dezelfde updated_at,
+    # en de snapshot-map (YYYY-MM-DD) komt uit hetzelfde moment
+    now = datetime.now(timezone.utc)
+    run_ts = now.isoformat()
+    run_date = now.date().isoformat()
     all_manifest: Dict[str, Any] = {"datasets": {}}
+    prior_entries: Dict[str, Any] = load_manifest().get("datasets", {})
     LATEST_DIR.mkdir(parents=True, exist_ok=True)
 
-    for cfg in DATASETS:
-        try:
-            dataset_id, entry = process_dataset(cfg)
-            all_manifest["datasets"][dataset_id] = entry
-        except Exception as e:
-            log.error("Dataset %s is mislukt: %s", cfg["id"], e)
-            # Niet meteen hele ETL afbreken; ga door met andere datasets
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(DATASETS))) as ex:
+        futures = [(cfg, ex.submit(process_dataset, cfg, run_ts, run_date, prior_entries.get(cfg["id"]))) for cfg in DATASETS]
+        # Resultaten in DATASETS-volgorde verzamelen, zodat het manifest stabiel blijft
+        for cfg, fut in futures:
+            try:
+                dataset_id, entry = fut.result()
+                all_manifest["datasets"][dataset_id] = entry
+            except Exception as e:
+                log.error("Dataset %s is mislukt: %s", cfg["id"], e)
+                # Niet meteen hele ETL afbreken; ga door met andere datasets
 
     # Manifest schrijven
     write_json(MANIFEST_OUT, all_manifest)